@@ -6,13 +6,12 @@ fd = flowio.FlowData('fcs_files/100715.fcs')
 spill, markers = flowutils.compensate.get_spill(fd.text['spill'])
 events = numpy.reshape(fd.events, (-1, fd.channel_count))
 
-fluoro_indices = []
-
-for channel in fd.channels:
-    if fd.channels[channel]['PnN'] in markers:
-        fluoro_indices.append(int(channel) - 1)
-
-fluoro_indices.sort()
+# channel numbers are 1-indexed strings, iterating in numeric order
+# produces the (0-indexed) fluorescent channel indices already sorted
+fluoro_indices = [
+    int(channel) - 1 for channel in sorted(fd.channels, key=int)
+    if fd.channels[channel]['PnN'] in markers
+]
 
 comp_events = flowutils.compensate.compensate(
     events,
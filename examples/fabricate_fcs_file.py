@@ -1,50 +1,86 @@
+import hashlib
+import os
 import numpy as np
 from flowio.create_fcs import create_fcs
 
+# cluster means & covariances, these clusters are clearly separated
+CLUSTER_MEANS = [
+    [6000.0, 6000.0, 0.0, 3000.0],
+    [-10.0, 0.0, 0.0, 0.0],
+    [7000.0, 2000.0, -6.0, 1500],
+    [2000.0, 7000.0, 1500.0, -6.0]
+]
+CLUSTER_COVS = [
+    [
+        [600000,  300,   0,   0],
+        [300,   1000,   0,   0],
+        [0,     0, 1,   10],
+        [0,     0,   10,    1000]
+    ],
+    [
+        [10000,    100,   0,   0],
+        [100,      10000,   0,   0],
+        [0,   0,   100000,   0],
+        [0,     0,   0, 1000]
+    ],
+    [
+        [100000,    100,    0,    0],
+        [100,    100000,    100,    0],
+        [0,       100, 10000,    0],
+        [0,       0,    0, 10000]
+    ],
+    [
+        [100000,    100,    0,    0],
+        [100,    100000,    100,    0],
+        [0,       100, 10000,    0],
+        [0,       0,    0, 10000]
+    ]
+]
 
-if __name__ == '__main__':
-    np.random.seed(42)
 
-    # these clusters are clearly separated
-    cluster1 = np.random.multivariate_normal(
-        [6000.0, 6000.0, 0.0, 3000.0],
-        [
-            [600000,  300,   0,   0],
-            [300,   1000,   0,   0],
-            [0,     0, 1,   10],
-            [0,     0,   10,    1000]
-        ],
-        (2000,)
-    )
-    cluster2 = np.random.multivariate_normal(
-        [-10.0, 0.0, 0.0, 0.0],
-        [
-            [10000,    100,   0,   0],
-            [100,      10000,   0,   0],
-            [0,   0,   100000,   0],
-            [0,     0,   0, 1000]
-        ],
-        (2000,)
-    )
-    cluster3a = np.random.multivariate_normal(
-        [7000.0, 2000.0, -6.0, 1500],
-        [
-            [100000,    100,    0,    0],
-            [100,    100000,    100,    0],
-            [0,       100, 10000,    0],
-            [0,       0,    0, 10000]
-        ],
-        (2000,)
-    )
-    cluster3b = np.random.multivariate_normal(
-        [2000.0, 7000.0, 1500.0, -6.0],
-        [
-            [100000,    100,    0,    0],
-            [100,    100000,    100,    0],
-            [0,       100, 10000,    0],
-            [0,       0,    0, 10000]
-        ],
-        (2000,)
+def sample_clusters(rng, means, covs, n):
+    """
+    Draw n samples from each of several multivariate normal distributions.
+    All clusters share a single batch of standard normal draws, which is then
+    transformed per cluster using the Cholesky factor of its covariance.
+
+    Returns an array of shape (n_clusters, n, n_dims).
+    """
+    means = np.asarray(means, dtype=np.float64)
+    chols = np.linalg.cholesky(np.asarray(covs, dtype=np.float64))
+    z = rng.standard_normal((len(means), n, means.shape[1]))
+
+    return means[:, None, :] + np.einsum('kij,knj->kni', chols, z)
+
+
+def load_or_sample_clusters(seed, means, covs, n):
+    """
+    Load previously fabricated cluster samples from a hidden .npy cache file,
+    keyed by the seed & cluster parameters, else sample the clusters & save
+    them for subsequent runs. Cached samples are memory-mapped on load.
+    """
+    key = hashlib.md5(
+        np.asarray(means, dtype=np.float64).tobytes() +
+        np.asarray(covs, dtype=np.float64).tobytes()
+    ).hexdigest()[:8]
+    # hidden file, also ignored by git
+    cache_file = '.fabricated_clusters_%d_%d_%s.npy' % (seed, n, key)
+
+    if os.path.exists(cache_file):
+        return np.load(cache_file, mmap_mode='r')
+
+    clusters = sample_clusters(np.random.default_rng(seed), means, covs, n)
+    np.save(cache_file, clusters)
+
+    return clusters
+
+
+if __name__ == '__main__':
+    cluster1, cluster2, cluster3a, cluster3b = load_or_sample_clusters(
+        42,
+        CLUSTER_MEANS,
+        CLUSTER_COVS,
+        2000
     )
 
     data_set1 = np.vstack(
@@ -53,7 +89,7 @@ if __name__ == '__main__':
             cluster2,
             cluster3a
         ]
-    ).flatten().tolist()
+    )
 
     data_set2 = np.vstack(
         [
@@ -61,7 +97,7 @@ if __name__ == '__main__':
             cluster2,
             cluster3b
         ]
-    ).flatten().tolist()
+    )
 
     channel_names = [
         'channel_A',
@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import flowio
+
+fcs_dir = 'fcs_files'
+
+
+def read_channels(path):
+    # only the TEXT segment is needed for the channel labels, so the DATA
+    # offsets don't matter (some example files have conflicting offsets)
+    try:
+        fd = flowio.FlowData(path, only_text=True, ignore_offset_discrepancy=True)
+    except flowio.exceptions.FlowIOException as e:
+        # report the file & keep going with the rest
+        return '%s\n\t%s: %s' % (os.path.basename(path), e.__class__.__name__, e)
+
+    lines = [fd.name]
+    for channel in sorted(fd.channels, key=int):
+        lines.append(
+            '\t'.join(
+                [
+                    channel,
+                    fd.channels[channel]['PnN'],
+                    fd.channels[channel].get('PnS', '')
+                ]
+            )
+        )
+
+    return '\n'.join(lines)
+
+
+files = [
+    os.path.join(fcs_dir, f) for f in sorted(os.listdir(fcs_dir))
+    if f.endswith('.fcs')
+]
+
+# reading each file is I/O bound, so overlap the reads using threads
+with ThreadPoolExecutor(max_workers=8) as executor:
+    for result in executor.map(read_channels, files):
+        print(result)
+        print()
@@ -1,11 +1,107 @@
+import io
 import re
+import struct
+import sys
 from array import array
-from collections import OrderedDict
 from .exceptions import PnEWarning
 from .fcs_keywords import FCS_STANDARD_REQUIRED_KEYWORDS, \
     FCS_STANDARD_OPTIONAL_KEYWORDS
 import warnings
 
+# buffer size used when given an unbuffered (raw) file handle
+_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# event data is written in the native byte order, so record that order
+# in the BYTEORD keyword instead of swapping bytes on big-endian hosts
+_NATIVE_BYTEORD = '1,2,3,4' if sys.byteorder == 'little' else '4,3,2,1'
+
+# number of event data values converted to 32-bit floats at a time
+_CONVERT_CHUNK_SIZE = 1024 * 1024
+
+# array typecodes for storing integer event data, narrowest first
+_UINT_TYPECODES = ['H', 'I' if array('I').itemsize == 4 else 'L']
+
+# sets of the standard keywords for fast membership tests in _build_text
+_REQUIRED_KEYWORDS = frozenset(FCS_STANDARD_REQUIRED_KEYWORDS)
+_OPTIONAL_KEYWORDS = frozenset(FCS_STANDARD_OPTIONAL_KEYWORDS)
+
+# channel parameter keywords handled in create_fcs: Pn(B, E, G, R, N, S)
+_PNX_CHANNEL_REGEX = re.compile(r'^p\d+[begrns]$')
+
+# channel parameter keywords that are FCS standard optional keywords
+_PNX_OPTIONAL_REGEX = re.compile(r'^p\d+(?:[dfloptv]|calibration)$')
+
+
+def _escape_delimiter(value, text_delimiter):
+    """
+    This function is for internal use only & doubles any occurrence of the
+    delimiter in the given keyword value, per the FCS specification. Values
+    rarely contain the delimiter, so a scan for it avoids the allocation of
+    a new string in the common case.
+
+    :param value: str keyword value
+    :param text_delimiter: str character used for the keyword delimiter
+    :return: str keyword value with escaped delimiter characters
+    """
+    if text_delimiter in value:
+        return value.replace(text_delimiter, text_delimiter * 2)
+
+    return value
+
+
+def _as_int_list(event_data):
+    """
+    This function is for internal use only & converts the given event data
+    values to a list of ints, provided every value is a whole number (e.g.
+    a float value of 3.0). Fractional values are rejected instead of being
+    silently rounded.
+
+    :param event_data: flat sequence of numeric event data values
+    :return: list of int event data values
+    """
+    int_values = []
+    append_value = int_values.append
+
+    for value in event_data:
+        try:
+            int_value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            int_value = None
+
+        if int_value is None or int_value != value:
+            raise ValueError(
+                "Event data must contain only integer values for the integer data type"
+            )
+
+        append_value(int_value)
+
+    return int_values
+
+
+def _as_uint_array(event_data):
+    """
+    This function is for internal use only & converts the given event data
+    to an array of unsigned integers, using the narrowest bit width (16 or
+    32 bits) able to store all the event data values. Float values are
+    accepted if they are whole numbers.
+
+    :param event_data: flat sequence of integer event data values
+    :return: array.array of unsigned 16-bit or 32-bit integers
+    """
+    for typecode in _UINT_TYPECODES:
+        try:
+            return array(typecode, event_data)
+        except OverflowError:
+            # a value is out of range for this bit width, try the next one
+            continue
+        except TypeError:
+            # array won't take floats, convert them if they're whole numbers
+            return _as_uint_array(_as_int_list(event_data))
+
+    raise ValueError(
+        "Event data values must be in the range 0 to 4294967295 for the integer data type"
+    )
+
 
 def _build_text(
         required_dict,
@@ -21,7 +117,12 @@ def _build_text(
     :param metadata_dict: dict of other keywords to include (some will be ignored)
     :return: UTF-8 encoded string to use for the TEXT section of an FCS file
     """
-    result = text_delimiter
+    # TEXT is assembled from a list of keyword/value strings & joined once
+    # at the end, avoiding repeated (quadratic) string concatenation. Each
+    # keyword/value pair is added as its separate parts, so no per-pair
+    # string formatting is needed either.
+    result = [text_delimiter]
+    extend_result = result.extend
 
     # used to store non-standard FCS keywords, which will be tacked on
     # at the end
@@ -41,11 +142,14 @@ def _build_text(
 
     # Required keys go first
     for key in required_dict.keys():
-        result += '$%s%s%s%s' % (
-            key,
-            text_delimiter,
-            required_dict[key].replace(text_delimiter, text_delimiter * 2),
-            text_delimiter
+        extend_result(
+            (
+                '$',
+                key,
+                text_delimiter,
+                _escape_delimiter(required_dict[key], text_delimiter),
+                text_delimiter
+            )
         )
 
     # Next, iterate over all given metadata.
@@ -60,21 +164,20 @@ def _build_text(
             # The keys have already been pre-processed to be lowercase & have
             # any leading "$" characters removed
             # check if the keyword is a standard required keyword
-            if key in FCS_STANDARD_REQUIRED_KEYWORDS:
+            if key in _REQUIRED_KEYWORDS:
                 # skip it, these are allowed to be set by the user
                 continue
 
             # Check for channel parameter keywords that are handled in create_fcs:
             #   Pn(B, E, G, R, N, S)
-            pnx_match = re.match(r'^(p)(\d+)([begrns])$', key)
-            if pnx_match is not None:
+            if _PNX_CHANNEL_REGEX.match(key) is not None:
                 # regardless of the channel parameter type, we'll skip it.
                 # These parameter keys are handled separately.
                 continue
 
             # check if the key is an FCS standard optional keyword
-            pnx_match = re.match(r'^p\d+([dfloptv]|calibration)$', key)
-            if key not in FCS_STANDARD_OPTIONAL_KEYWORDS and pnx_match is None:
+            if key not in _OPTIONAL_KEYWORDS and \
+                    _PNX_OPTIONAL_REGEX.match(key) is None:
                 # save it for later, we'll put all the non-standard
                 # keys at the end
                 non_std_dict[key] = value
@@ -83,27 +186,73 @@ def _build_text(
             # Note we add the '$' character here for FCS standard keywords
             # We also check for the presence of the delimiter in the value.
             # If the delimiter is found, we double it per the FCS standard.
-            result += '$%s%s%s%s' % (
-                key.upper(),  # convert to uppercase for consistency
-                text_delimiter,
-                value.replace(text_delimiter, text_delimiter * 2),
-                text_delimiter
+            extend_result(
+                (
+                    '$',
+                    key.upper(),  # convert to uppercase for consistency
+                    text_delimiter,
+                    _escape_delimiter(value, text_delimiter),
+                    text_delimiter
+                )
             )
 
         # Now process any non-standard metadata
         for key, value in non_std_dict.items():
             # these have already been checked, so just write them out
-            result += '%s%s%s%s' % (
-                key.upper(),
-                text_delimiter,
-                value.replace(
-                    text_delimiter, text_delimiter * 2
-                ),
-                text_delimiter
+            extend_result(
+                (
+                    key.upper(),
+                    text_delimiter,
+                    _escape_delimiter(value, text_delimiter),
+                    text_delimiter
+                )
             )
 
     # return as UTF-8 in case there are any 2-byte characters
-    return result.encode('UTF-8')
+    return ''.join(result).encode('UTF-8')
+
+
+def _flatten_event_data(event_data, as_float=False):
+    """
+    This function is for internal use only & returns the given event data as
+    a flat (1-D) sequence. Objects supporting the buffer protocol (e.g. NumPy
+    arrays or array.array instances) are flattened in row-major (C) order via
+    a memoryview, avoiding the creation of an intermediate list of floats.
+
+    :param event_data: list, array.array, or NumPy array of event data
+    :param as_float: if True, NumPy arrays of any other type are first converted
+        to 32-bit floats using NumPy, which is much faster than coercing each
+        value to a float when writing the data
+    :return: flat sequence of event data values
+    """
+    try:
+        data_view = memoryview(event_data)
+    except TypeError:
+        # not a buffer (e.g. a list), nothing to do
+        return event_data
+
+    if as_float and data_view.format != 'f' and hasattr(event_data, 'astype'):
+        # NumPy isn't a dependency, but if we were given a NumPy array then
+        # let it do the conversion in C (e.g. from float64 or big-endian data)
+        event_data = event_data.astype('float32')
+        data_view = memoryview(event_data)
+
+    if data_view.nbytes == 0:
+        # empty data (e.g. a 0 x n_channels array) can't be cast, & has no events
+        return []
+
+    if data_view.c_contiguous:
+        byte_view = data_view.cast('B')
+    else:
+        # non-contiguous buffers (e.g. strided NumPy slices) are copied in C order
+        byte_view = memoryview(data_view.tobytes())
+
+    try:
+        return byte_view.cast(data_view.format)
+    except (TypeError, ValueError):
+        # memoryview only supports casting native formats, fall back to
+        # unpacking the values for anything else (e.g. '>f' or '>h')
+        return [value for (value,) in struct.iter_unpack(data_view.format, byte_view)]
 
 
 def create_fcs(
@@ -116,6 +265,13 @@ def create_fcs(
     """
     Create a new FCS file from a list of event data.
 
+    Note:
+        Event data is stored as 32-bit floats by default. Setting the 'datatype'
+        keyword to 'I' in the metadata_dict stores the event data as unsigned
+        integers instead, using 16 bits per value when all values are less than
+        65536 (halving the size of the DATA segment), else 32 bits per value.
+        In this case, all event data values must be non-negative whole numbers.
+
     Note:
         A proper spillover matrix shall have the first value corresponding to the
         number of compensated fluorescence channels followed by the $PnN names
@@ -123,7 +279,9 @@ def create_fcs(
         spill text string should be comma delimited with no newline characters.
 
     :param file_handle: file handle for new FCS file
-    :param event_data: list of event data (flattened 1-D list)
+    :param event_data: list, array.array, or NumPy array of event data. Multi-dimensional
+        arrays are flattened in row-major (C) order, i.e. a NumPy array of shape
+        (n_events, n_channels) can be passed directly
     :param channel_names: list of channel labels to use for PnN fields
     :param opt_channel_names: optional list of channel labels to use for PnS fields
     :param metadata_dict: an optional dictionary for adding extra metadata keywords/values
@@ -143,22 +301,46 @@ def create_fcs(
                 "Number of PnN labels does not match the number of PnS channels"
             )
 
+    # Process the given metadata_dict to coerce the keys to lowercase.
+    # This makes it easier to find the gain values below & to process
+    # the other keys (don't have to worry about matching mixed case).
+    proc_metadata_dict = {}
+
+    if metadata_dict is not None:
+        for k, v in metadata_dict.items():
+            # remove any leading '$' characters from the keyword
+            proc_metadata_dict[k.lstrip('$').lower()] = v
+
+    # Verify data type is float or integer. Float is easy b/c all
+    # parameters must use 32 bits per event value. The int type allows
+    # setting different bit allocations for event data per channel, but
+    # we only support a uniform bit width for all channels, using the
+    # narrowest width that can store all the event data values.
+    data_type = 'F'
+    if 'datatype' in proc_metadata_dict:
+        datatype_value = proc_metadata_dict['datatype']
+        if datatype_value.upper() not in ['F', 'I']:
+            raise NotImplementedError(
+                "Creating FCS files with data type %s is not supported." % datatype_value
+            )
+        data_type = datatype_value.upper()
+
+    event_data = _flatten_event_data(event_data, as_float=data_type == 'F')
     n_points = len(event_data)
 
     if not n_points % n_channels == 0:
         raise ValueError(
             "Number of data points is not a multiple of the number of channels"
         )
-    data_size = 4 * n_points  # 4 bytes per float (we only store floats)
 
-    # Construct the primary text section using OrderedDict to preserve order
-    text = OrderedDict()
+    # Construct the primary text section, dicts preserve insertion order
+    text = {}
     text['BEGINANALYSIS'] = '0'
     text['BEGINDATA'] = ''  # IMPORTANT: this gets replaced later
     # noinspection SpellCheckingInspection
     text['BEGINSTEXT'] = '0'
-    text['BYTEORD'] = '1,2,3,4'  # little endian
-    text['DATATYPE'] = 'F'  # only do float data
+    text['BYTEORD'] = _NATIVE_BYTEORD  # little endian on most platforms
+    text['DATATYPE'] = data_type  # 'F' (float) by default, or 'I' (integer)
     text['ENDANALYSIS'] = '0'
     text['ENDDATA'] = ''  # IMPORTANT: this gets replaced as well
     # noinspection SpellCheckingInspection
@@ -169,42 +351,36 @@ def create_fcs(
     text['PAR'] = str(n_channels)
     text['TOT'] = str(int(n_points / n_channels))
 
-    # Process the given metadata_dict to coerce the keys to lowercase.
-    # This makes it easier to find the gain values below & to process
-    # the other keys (don't have to worry about matching mixed case).
-    proc_metadata_dict = {}
+    if data_type == 'I':
+        event_data = _as_uint_array(event_data)
+        bit_width = event_data.itemsize * 8
+    else:
+        bit_width = 32
 
-    if metadata_dict is not None:
-        for k, v in metadata_dict.items():
-            # check if keyword starts with a '$' and remove any leading '$' characters
-            match = re.match(r'^\$*(.*)', k)
-            new_key = match.groups()[0]
-            new_key = new_key.lower()
+    data_size = bit_width // 8 * n_points
 
-            proc_metadata_dict[new_key] = v
-
-    # Verify data type is float, it's the only type supported for now.
-    # Supporting int type is more complicated b/c it allows setting
-    # different bit allocations for event data per channel. Float is
-    # easy b/c all parameters must use 32 bits per event value.
-    if 'datatype' in proc_metadata_dict:
-        datatype_value = proc_metadata_dict['datatype']
-        if datatype_value != 'F':
-            raise NotImplementedError(
-                "Creating FCS files with data type %s is not supported." % datatype_value
-            )
+    pnb_value = str(bit_width)
 
     for i in range(n_channels):
         chan_num = i + 1  # channel numbers in FCS are indexed at 1
 
+        # format the channel keyword prefixes once for all the keywords
+        # below, lowercase for the metadata keys & uppercase for the text
+        meta_prefix = 'p%d' % chan_num
+        chan_prefix = 'P%d' % chan_num
+
         # Channel gain (PnG), lin/log (PnE), & range (PnR) are exceptions where we
         # look in the provided metadata to find the values. We could do this later
         # in the build_text function, but it's nicer if all the channel parameter
         # keywords are in the same place in the file.
 
         # PnE - lin/log
-        pne_key = 'p%de' % chan_num
-        if pne_key in proc_metadata_dict:
+        # Float data must be linear (0,0), integer data may use a log scale
+        pne_key = meta_prefix + 'e'
+        chan_pne_value = '0,0'
+        if pne_key in proc_metadata_dict and data_type == 'I':
+            chan_pne_value = proc_metadata_dict[pne_key]
+        elif pne_key in proc_metadata_dict:
             pne_value = proc_metadata_dict[pne_key]
             # Allow '0,0', '0.0,0.0', etc.
             (decades, log0) = [float(x) for x in pne_value.split(',')]
@@ -215,7 +391,7 @@ def create_fcs(
                 )
 
         # PnG - gain
-        png_key = 'p%dg' % chan_num
+        png_key = meta_prefix + 'g'
         if png_key in proc_metadata_dict:
             png_value = proc_metadata_dict[png_key]
         else:
@@ -226,24 +402,27 @@ def create_fcs(
         # of 262144 for the maximum range value. 262144 (2^18) is used by
         # many cytometers and by FlowJo to determine the default display
         # range for plotting. Per FCS 3.1, it is allowed that the maximum
-        # event value for a channel can exceed this value.
-        pnr_key = 'p%dr' % chan_num
+        # event value for a channel can exceed this value. For integer data,
+        # the range defaults to the maximum range of the bit width.
+        pnr_key = meta_prefix + 'r'
         if pnr_key in proc_metadata_dict:
             pnr_value = proc_metadata_dict[pnr_key]
+        elif data_type == 'I':
+            pnr_value = str(2 ** bit_width)
         else:
             pnr_value = '262144'
 
-        text['P%dB' % chan_num] = '32'  # float requires 32 bits
-        text['P%dE' % chan_num] = '0,0'  # float requires 0,0
-        text['P%dG' % chan_num] = png_value
-        text['P%dR' % chan_num] = pnr_value
-        text['P%dN' % chan_num] = channel_names[i]
+        text[chan_prefix + 'B'] = pnb_value  # 32 for float, 16 or 32 for int
+        text[chan_prefix + 'E'] = chan_pne_value  # always 0,0 for float
+        text[chan_prefix + 'G'] = png_value
+        text[chan_prefix + 'R'] = pnr_value
+        text[chan_prefix + 'N'] = channel_names[i]
 
         # PnS - optional channel label
         if opt_channel_names is not None:
             # cannot have zero-length values in FCS keyword values
             if opt_channel_names[i] not in [None, '']:
-                text['P%dS' % chan_num] = opt_channel_names[i]
+                text[chan_prefix + 'S'] = opt_channel_names[i]
 
     # Calculate initial text size, but it's tricky b/c the text contains the
     # byte offset location for the data, which depends on the size of the
@@ -260,64 +439,56 @@ def create_fcs(
     # BEGINDATA & ENDDATA text values were allowed to be empty strings
     # NOTE: end data value is the location of the last data byte (so minus 1)
     initial_begin_data_offset = text_start + len(text_string)
-    initial_end_data_offset = initial_begin_data_offset + data_size - 1
 
     # data start offset location must account for the string lengths
-    # of BOTH the BEGINDATA & ENDDATA text values.
-    # get initial BEGINDATA string length
-    begin_data_value_length = len(str(initial_begin_data_offset))
-    # get initial ENDDATA string length
-    end_data_value_length = len(str(initial_end_data_offset))
-
-    # now determine how close either of these are to adding a new digit
-    begin_data_diff = 10**begin_data_value_length - initial_begin_data_offset
-    end_data_diff = 10**end_data_value_length - initial_end_data_offset
-
-    # since neither our initial offsets include the value lengths,
-    # if a diff value <= the sum of the value lengths AND not zero,
-    # then the BEGINDATA offset needs to be incremented by 1.
-    # If both diff values are <= sum of value lengths, then the
-    # BEGINDATA offset needs to be incremented by 2.
-    #
-    # Note if a diff value is 0 then the offset just ticked over
-    # to a new digit length (e.g. 1000) and is in no danger of
-    # increasing another digit
-    total_data_values_length = begin_data_value_length + end_data_value_length
-    begin_data_offset_correction = 0
-    if begin_data_diff <= total_data_values_length and begin_data_diff != 0:
-        begin_data_offset_correction += 1
-    if end_data_diff <= total_data_values_length and end_data_diff != 0:
-        begin_data_offset_correction += 1
-
-    final_begin_data_offset = initial_begin_data_offset + \
-        begin_data_value_length + \
-        end_data_value_length + \
-        begin_data_offset_correction
+    # of BOTH the BEGINDATA & ENDDATA text values. Only the number of
+    # digits of these values matter, so starting from the initial offset
+    # iterate until the data start offset no longer changes. Each pass can
+    # only add digits, so this converges within a couple of iterations.
+    final_begin_data_offset = initial_begin_data_offset
+    while True:
+        next_begin_data_offset = initial_begin_data_offset + \
+            len(str(final_begin_data_offset)) + \
+            len(str(final_begin_data_offset + data_size - 1))
+
+        if next_begin_data_offset == final_begin_data_offset:
+            break
+
+        final_begin_data_offset = next_begin_data_offset
+
+    final_end_data_offset = final_begin_data_offset + data_size - 1
 
     text['BEGINDATA'] = str(final_begin_data_offset)
-    text['ENDDATA'] = str(final_begin_data_offset + data_size - 1)
+    text['ENDDATA'] = str(final_end_data_offset)
+
+    # Rather than re-building the entire text section, splice the final
+    # BEGINDATA & ENDDATA values into the rendered text. Both are required
+    # keywords, which are always written first, so the first occurrence of
+    # each (empty) keyword/value pair is the one to replace.
+    delimiter_bytes = delimiter.encode()
+    for key in ['BEGINDATA', 'ENDDATA']:
+        key_bytes = b'$' + key.encode() + delimiter_bytes
+        text_string = text_string.replace(
+            key_bytes + delimiter_bytes,
+            key_bytes + text[key].encode() + delimiter_bytes,
+            1
+        )
 
-    # re-build text section and sanity check the data start location
-    text_string = _build_text(
-        text,
-        delimiter,
-        metadata_dict=proc_metadata_dict
-    )
     # verify the final BEGINDATA value == text start position + length of the text string
     if text_start + len(text_string) != int(text['BEGINDATA']):
         raise Exception("REPORT BUG: error calculating text offset")
 
     #
-    # Start writing to file, beginning with header
+    # Build the header in memory so it can be written with a single call
     #
-    file_handle.seek(0)
-    file_handle.write('FCS3.1'.encode())
-    spaces = ' ' * 4
-    file_handle.write(spaces.encode())  # spaces for bytes 6 -> 9
-    file_handle.write('{0: >8}'.format(str(text_start)).encode())
-
-    # Text end byte is one less than where our data starts
-    file_handle.write('{0: >8}'.format(str(final_begin_data_offset - 1)).encode())
+    # NOTE: header offsets are 8-byte, right-aligned, space padded integers
+    header = [
+        b'FCS3.1',
+        b' ' * 4,  # spaces for bytes 6 -> 9
+        b'%8d' % text_start,
+        # Text end byte is one less than where our data starts
+        b'%8d' % (final_begin_data_offset - 1)
+    ]
 
     # Header contains data start and end byte locations. However,
     # the FCS 3.1 spec allows for only 8-byte ASCII encoded integers.
@@ -325,28 +496,60 @@ def create_fcs(
     # past 99,999,999 bytes then both the data start & end values shall
     # be set to zero.
     byte_limit = 99999999
-    if int(text['ENDDATA']) <= byte_limit:
-        file_handle.write('{0: >8}'.format(text['BEGINDATA']).encode())
-        file_handle.write('{0: >8}'.format(text['ENDDATA']).encode())
+    if final_end_data_offset <= byte_limit:
+        header.append(b'%8d' % final_begin_data_offset)
+        header.append(b'%8d' % final_end_data_offset)
     else:
-        file_handle.write('{0: >8}'.format('0').encode())
-        file_handle.write('{0: >8}'.format('0').encode())
+        header.append(b'%8d' % 0)
+        header.append(b'%8d' % 0)
 
     # We don't support analysis sections so write space padded 8 byte '0'
-    file_handle.write('{0: >8}'.format('0').encode())
+    header.append(b'%8d' % 0)
 
     # Ditto for the analysis end
-    file_handle.write('{0: >8}'.format('0').encode())
-
-    # Write spaces until the start of the text segment
-    spaces = ' ' * (text_start - file_handle.tell())
-    file_handle.write(spaces.encode())
+    header.append(b'%8d' % 0)
 
-    # Write out the entire text section (already UTF-8 encoded)
-    file_handle.write(text_string)
+    # Pad with spaces until the start of the text segment
+    header = b''.join(header)
+    header += b' ' * (text_start - len(header))
 
-    # And now our data!
-    float_array = array('f', event_data)
-    float_array.tofile(file_handle)
+    #
+    # Start writing to file, beginning with header
+    #
+    # Raw (unbuffered) file handles issue a system call for every write &
+    # are allowed to write only part of the given bytes, so wrap those in
+    # a buffered writer. It is detached when done to leave the given file
+    # handle open for the caller.
+    if isinstance(file_handle, io.RawIOBase):
+        out_handle = io.BufferedWriter(file_handle, buffer_size=_WRITE_BUFFER_SIZE)
+    else:
+        out_handle = file_handle
+
+    try:
+        # Write the header & the entire text section (already UTF-8 encoded)
+        # together, both are small compared to the data
+        out_handle.seek(0)
+        out_handle.write(header + text_string)
+
+        # And now our data! Float event data already stored as 32-bit floats
+        # (e.g. a float32 NumPy array or an array.array of type 'f') is written
+        # as-is, anything else is converted first.
+        if data_type == 'I':
+            # already converted to an array of unsigned integers
+            event_data.tofile(out_handle)
+        elif isinstance(event_data, memoryview) and event_data.format == 'f':
+            out_handle.write(event_data)
+        else:
+            # convert & write in chunks, so only a chunk of the converted values
+            # is held in memory alongside the given event data
+            for i in range(0, n_points, _CONVERT_CHUNK_SIZE):
+                float_array = array('f', event_data[i:i + _CONVERT_CHUNK_SIZE])
+                float_array.tofile(out_handle)
+    finally:
+        # always detach a wrapping writer, else it closes the caller's
+        # file handle when garbage collected (e.g. after an error)
+        if out_handle is not file_handle:
+            out_handle.flush()
+            out_handle.detach()
 
     return file_handle
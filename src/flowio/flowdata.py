@@ -1,19 +1,30 @@
 import array
-from operator import and_
+import io
 from struct import calcsize, iter_unpack
 from warnings import warn
 import os
 import re
-from functools import reduce
+import sys
+from functools import lru_cache
+from itertools import chain
 from .create_fcs import create_fcs
 from .exceptions import FCSParsingError, DataOffsetDiscrepancyError, MultipleDataSetsError
 
-try:
-    # noinspection PyUnresolvedReferences, PyUnboundLocalVariable
-    basestring
-except NameError:
-    # noinspection PyShadowingBuiltins
-    basestring = str
+# arrays are read in the native byte order, so only data stored in the
+# opposite byte order needs swapping
+_SWAPPED_ORDER = '>' if sys.byteorder == 'little' else '<'
+
+# array & struct formats for the supported integer bit widths
+_INT_FORMATS = {8: 'B', 16: 'H', 32: 'I'}
+
+# matches the PnN & PnS keywords for channel labels
+_CHANNEL_LABEL_REGEX = re.compile(r'^p(\d+)([ns])$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _pair_regex(delimiter):
+    """Return compiled regex matching the (regex escaped) delimiter unless it's doubled"""
+    return re.compile('(?<=[^%s])%s(?!%s)' % (delimiter, delimiter, delimiter))
 
 
 def _next_power_of_2(x):
@@ -58,7 +69,7 @@ class FlowData(object):
     :ivar name: file name of the imported FCS file
     :ivar text: dictionary of key/value pairs from the TEXT section
 
-    :param filename_or_handle: a path string or a file handle for an FCS file
+    :param filename_or_handle: a path string, path-like object, or a file handle for an FCS file
     :param ignore_offset_error: option to ignore data offset error (see above note), default is False
     :param ignore_offset_discrepancy: option to ignore discrepancy between the HEADER
         and TEXT values for the DATA byte offset location, default is False
@@ -78,24 +89,36 @@ class FlowData(object):
             only_text=False,
             nextdata_offset=None,
     ):
-        if isinstance(filename_or_handle, basestring):
-            self._fh = open(str(filename_or_handle), 'rb')
-        else:
+        try:
+            # accepts path strings & path-like objects (e.g. pathlib.Path)
+            file_path = os.fspath(filename_or_handle)
+        except TypeError:
             self._fh = filename_or_handle
+        else:
+            self._fh = open(file_path, 'rb')
 
         current_offset = nextdata_offset if nextdata_offset else 0
 
         self._ignore_offset = ignore_offset_error
 
         try:
-            unused_path, self.name = os.path.split(self._fh.name)
+            # decode bytes paths, so the name is always a str
+            unused_path, self.name = os.path.split(os.fsdecode(self._fh.name))
         except (AttributeError, TypeError):
             self.name = 'InMemoryFile'
 
-        # Get actual file size for sanity check of data section
-        self._fh.seek(0, os.SEEK_END)
-        self.file_size = self._fh.tell()
-        self._fh.seek(current_offset)  # reset to beginning before parsing
+        # Get actual file size for sanity check of data section. For files
+        # opened read-only with open() ask the OS, else seek to the end.
+        # Writable handles may still have buffered bytes not yet on disk, &
+        # other file objects may have a file descriptor for a different size,
+        # e.g. the compressed size of a gzip file.
+        raw_fh = getattr(self._fh, 'raw', self._fh)
+        if isinstance(raw_fh, io.FileIO) and not self._fh.writable():
+            self.file_size = os.fstat(raw_fh.fileno()).st_size
+        else:
+            self._fh.seek(0, os.SEEK_END)
+            self.file_size = self._fh.tell()
+            self._fh.seek(current_offset)  # reset to beginning before parsing
 
         # parse headers
         self.header = self.__parse_header(current_offset)
@@ -211,6 +234,7 @@ class FlowData(object):
         if only_text:
             self.events = None
         else:
+            self.__advise_sequential_read(current_offset, data_start, data_stop)
             self.events = self.__parse_data(
                 current_offset,
                 data_start,
@@ -238,35 +262,83 @@ class FlowData(object):
 
         return data
 
+    def __advise_sequential_read(self, offset, start, stop):
+        """
+        Hint to the OS that bytes from start to stop inclusive will be read
+        sequentially, so readahead can begin early & use a larger window.
+        Only applies to files opened with open() on platforms supporting
+        posix_fadvise (e.g. Linux), the hint is otherwise skipped.
+        """
+        raw_fh = getattr(self._fh, 'raw', self._fh)
+        if not hasattr(os, 'posix_fadvise') or not isinstance(raw_fh, io.FileIO):
+            return
+
+        try:
+            fd = raw_fh.fileno()
+            length = stop - start + 1
+            os.posix_fadvise(fd, offset + start, length, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, offset + start, length, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            # it's only advice, reading will still work without it
+            pass
+
+    def __read_array(self, offset, start, typecode, count):
+        """
+        Read in count items of the given array typecode beginning at start.
+        The bytes are read directly into a pre-allocated array, avoiding the
+        intermediate bytes object created by array.fromfile.
+        """
+        self._fh.seek(offset + start)
+
+        if not hasattr(self._fh, 'readinto'):
+            tmp = array.array(typecode)
+            tmp.fromfile(self._fh, count)
+            return tmp
+
+        tmp = array.array(typecode, [0]) * count
+
+        # the views are released on exit so the array can be resized later
+        with memoryview(tmp) as tmp_view, tmp_view.cast('B') as byte_view:
+            n_read = 0
+            while n_read < len(byte_view):
+                # raw file handles may return fewer bytes than requested
+                n = self._fh.readinto(byte_view[n_read:])
+                if not n:
+                    raise EOFError("read() didn't return enough bytes")
+                n_read += n
+
+        return tmp
+
     def __parse_header(self, offset):
         """
         Parse the FlowData FCS file at the offset (supporting multiple
         data segments in a file
         """
+        # the HEADER fields have fixed locations, read them all at once
+        raw_header = self.__read_bytes(offset, 0, 57)
+
         header = dict()
-        header['version'] = self.__read_bytes(offset, 3, 5).decode()
-        header['text_start'] = int(self.__read_bytes(offset, 10, 17))
-        header['text_stop'] = int(self.__read_bytes(offset, 18, 25))
-        header['data_start'] = int(self.__read_bytes(offset, 26, 33))
-        header['data_stop'] = int(self.__read_bytes(offset, 34, 41))
+        header['version'] = raw_header[3:6].decode()
+        header['text_start'] = int(raw_header[10:18])
+        header['text_stop'] = int(raw_header[18:26])
+        header['data_start'] = int(raw_header[26:34])
+        header['data_stop'] = int(raw_header[34:42])
         try:
-            header['analysis_start'] = int(self.__read_bytes(offset, 42, 49))
+            header['analysis_start'] = int(raw_header[42:50])
         except ValueError:
             header['analysis_start'] = -1
         try:
-            header['analysis_stop'] = int(self.__read_bytes(offset, 50, 57))
+            header['analysis_stop'] = int(raw_header[50:58])
         except ValueError:
             header['analysis_stop'] = -1
 
         return header
 
-    def __parse_text(self, offset, start, stop):
-        """return parsed text segment of FCS file"""
-        num_items = (stop - start + 1)
-        self._fh.seek(offset + start)
-        tmp = array.array('b')
-        tmp.fromfile(self._fh, int(num_items))
-        tmp = tmp.tobytes()
+    def __parse_segment(self, offset, start, stop):
+        """return parsed key/value pairs of a TEXT or ANALYSIS segment"""
+        tmp = self.__read_bytes(offset, start, stop)
+        if len(tmp) < stop - start + 1:
+            raise EOFError("read() didn't return enough bytes")
 
         try:
             # try UTF-8 first
@@ -274,27 +346,19 @@ class FlowData(object):
         except UnicodeDecodeError:
             # next best guess is Latin-1, if not that either, we throw the exception
             tmp = tmp.decode("ISO-8859-1")
+
         return self.__parse_pairs(tmp)
 
+    def __parse_text(self, offset, start, stop):
+        """return parsed text segment of FCS file"""
+        return self.__parse_segment(offset, start, stop)
+
     def __parse_analysis(self, offset, start, stop):
         """return parsed analysis segment of FCS file"""
         if start == stop:
             return {}
         else:
-            num_items = (stop - start + 1)
-            self._fh.seek(offset + start)
-            tmp = array.array('b')
-            tmp.fromfile(self._fh, int(num_items))
-            tmp = tmp.tobytes()
-
-            try:
-                # try UTF-8 first
-                tmp = tmp.decode()
-            except UnicodeDecodeError:
-                # next best guess is Latin-1, if not that either, we throw the exception
-                tmp = tmp.decode("ISO-8859-1")
-
-            return self.__parse_pairs(tmp)
+            return self.__parse_segment(offset, start, stop)
 
     def __parse_data(self, offset, start, stop, text):
         """
@@ -325,7 +389,7 @@ class FlowData(object):
             # bit-masked according to this max range value.
             bit_width_by_channel = {}
             max_range_by_channel = {}
-            for i in range(1, int(text['par']) + 1):
+            for i in range(1, self.channel_count + 1):
                 bit_width_by_channel[i] = int(text['p%db' % i])
 
                 # Need to verify the value is a power of 2
@@ -385,7 +449,7 @@ class FlowData(object):
 
                 raise FCSParsingError("Unable to determine the correct byte offsets for event data")
 
-        num_items = data_sect_size / data_type_size
+        num_items = data_sect_size // data_type_size
 
         return num_items, stop
 
@@ -400,22 +464,25 @@ class FlowData(object):
     ):
         """Parse out and return integer list data from FCS file"""
 
-        if reduce(and_, [item in [8, 16, 32] for item in bit_width_lut.values()]):
+        if set(bit_width_lut.values()).issubset((8, 16, 32)):
             # Determine if we have uniform bit width values for all parameters.
             # If so, use array.array for much faster parsing
             if len(set(bit_width_lut.values())) == 1:
                 # We do have a uniform bit width, grab the 1st value to
                 # determine the number of actual events
                 bit_width = list(bit_width_lut.values())[0]
-                data_type_size = bit_width / 8
+                data_type_size = bit_width // 8
                 num_items, stop = self.__calc_data_item_count(start, stop, data_type_size)
 
                 # Here, we're reading the initial data array, but some channel
                 # data may still need bit-masking correction using max range
-                self._fh.seek(offset + start)
-                tmp = array.array(self.__format_integer(bit_width))
-                tmp.fromfile(self._fh, int(num_items))
-                if order == '>':
+                tmp = self.__read_array(
+                    offset,
+                    start,
+                    self.__format_integer(bit_width),
+                    num_items
+                )
+                if order == _SWAPPED_ORDER:
                     tmp.byteswap()
 
                 # If any bits higher shall be
@@ -424,17 +491,25 @@ class FlowData(object):
                 if any(2 ** bit_width_lut[c] > max_range_lut[c] for
                        c in bit_width_lut.keys()):
 
-                    amount_data_points = int(num_items / len(max_range_lut))
-                    
+                    amount_data_points = num_items // len(max_range_lut)
+
                     # Create bit mask array matching length of our data array,
                     # with values for every position being the max range value.
+                    # Repeating a single event's mask is done in C by array.
                     bit_mask = array.array(
                         self.__format_integer(bit_width),
-                        [mr - 1 for mr in max_range_lut.values()] * amount_data_points
-                    )
-                    new_tmp = array.array(self.__format_integer(bit_width))
-                    new_tmp.frombytes(bytes(map(lambda a, b: a & b, tmp.tobytes(), bit_mask.tobytes())))
-                    tmp = new_tmp
+                        [mr - 1 for mr in max_range_lut.values()]
+                    ) * amount_data_points
+
+                    # Apply the mask to all the data at once by treating both
+                    # byte strings as (very large) Python ints. A bitwise AND
+                    # of the raw bytes doesn't depend on the byte order.
+                    n_bytes = len(bit_mask) * bit_mask.itemsize
+                    masked = int.from_bytes(memoryview(tmp).cast('B')[:n_bytes], 'little') & \
+                        int.from_bytes(bit_mask, 'little')
+
+                    tmp = array.array(self.__format_integer(bit_width))
+                    tmp.frombytes(masked.to_bytes(n_bytes, 'little'))
             else:
                 # parameter sizes are different
                 # e.g. 8, 8, 16, 8, 32 ...
@@ -456,22 +531,27 @@ class FlowData(object):
 
     def __extract_var_length_int(self, bit_width_by_channel, max_range_by_channel, 
                                  offset, order, start, stop):
-        data_format = order
-        for cur_width in bit_width_by_channel.values():
-            data_format += '%s' % self.__format_integer(cur_width)
+        data_format = order + ''.join(
+            [self.__format_integer(cur_width) for cur_width in bit_width_by_channel.values()]
+        )
 
         # array module doesn't have a function to heterogeneous bit widths,
-        # so fall back to the slower unpack approach
-        tuple_tmp = iter_unpack(data_format, self.__read_bytes(offset, start, stop))
-        if any(2**bit_width_by_channel[c] > max_range_by_channel[c] for 
-               c in bit_width_by_channel.keys()):
-            tmp = []
-            for data_tuple in tuple_tmp:
-                for channel, max_range in max_range_by_channel.items():
-                    tmp.append(data_tuple[channel-1] % max_range)
-        else:
-            tmp = [ti for t in tuple_tmp for ti in t]
-        
+        # so fall back to the slower unpack approach, flattening the event
+        # tuples in C
+        tmp = list(
+            chain.from_iterable(
+                iter_unpack(data_format, self.__read_bytes(offset, start, stop))
+            )
+        )
+
+        # only mask the channels whose range is less than the bit width,
+        # using a strided slice to update every value for that channel
+        n_channels = len(bit_width_by_channel)
+        for channel, max_range in max_range_by_channel.items():
+            if 2 ** bit_width_by_channel[channel] > max_range:
+                channel_slice = slice(channel - 1, None, n_channels)
+                tmp[channel_slice] = [v % max_range for v in tmp[channel_slice]]
+
         return tmp
 
     def __parse_non_int_data(self, offset, start, stop, data_type, order):
@@ -479,17 +559,15 @@ class FlowData(object):
         data_type_size = calcsize(data_type)
         num_items, stop = self.__calc_data_item_count(start, stop, data_type_size)
 
-        self._fh.seek(offset + start)
-        tmp = array.array(data_type)
-        tmp.fromfile(self._fh, int(num_items))
-        if order == '>':
+        tmp = self.__read_array(offset, start, data_type, num_items)
+        if order == _SWAPPED_ORDER:
             tmp.byteswap()
         return tmp
 
     @staticmethod
     def __parse_pairs(text):
         """return key/value pairs from a delimited string"""
-        delimiter = text[0]
+        delimiter = raw_delimiter = text[0]
 
         if delimiter == r'|':
             delimiter = r'\|'
@@ -498,29 +576,32 @@ class FlowData(object):
         elif delimiter == r'*':
             delimiter = r'\*'
 
-        tmp = text[1:-1].replace('$', '')
-        # match the delimited character unless it's doubled
-        regex = re.compile('(?<=[^%s])%s(?!%s)' % (
-            delimiter, delimiter, delimiter))
-        tmp = regex.split(tmp)
-        return dict(
-            zip(
-                [x.lower().replace(
-                    delimiter + delimiter, delimiter) for x in tmp[::2]],
-                [x.replace(delimiter + delimiter, delimiter) for x in tmp[1::2]]
-            )
-        )
+        tmp = text[1:-1]
+
+        if raw_delimiter * 2 not in tmp and not tmp.startswith(raw_delimiter):
+            # Without any doubled delimiters every delimiter separates a
+            # key or value, so a plain split matches the regex split below
+            tmp = tmp.split(raw_delimiter)
+        else:
+            # match the delimited character unless it's doubled
+            tmp = _pair_regex(delimiter).split(tmp)
+
+        # pair up alternating keys & values in a single pass. The '$'
+        # characters are removed from the keys only, values may contain
+        # them (e.g. in a comment)
+        doubled = delimiter + delimiter
+        items = iter(tmp)
+        return {
+            key.replace('$', '').lower().replace(doubled, delimiter): value.replace(doubled, delimiter)
+            for key, value in zip(items, items)
+        }
 
     @staticmethod
     def __format_integer(b):
         """return binary format of an integer"""
-        if b == 8:
-            return 'B'
-        elif b == 16:
-            return 'H'
-        elif b == 32:
-            return 'I'
-        else:
+        try:
+            return _INT_FORMATS[b]
+        except KeyError:
             raise FCSParsingError(
                 "Invalid integer bit size (%d) for event data. Compatible sizes are 8, 16, & 32." % b
             )
@@ -531,24 +612,26 @@ class FlowData(object):
         and value is a dictionary of the PnN and PnS text
         """
         channels = dict()
-        regex_pnn = re.compile(r"^p(\d+)n$", re.IGNORECASE)
+        pns_labels = dict()
 
-        for i in self.text.keys():
-            match = regex_pnn.match(i)
+        # find the PnN & PnS keywords in a single pass over the text
+        for key, value in self.text.items():
+            match = _CHANNEL_LABEL_REGEX.match(key)
             if not match:
                 continue
 
-            channel_num = match.groups()[0]
-            channels[channel_num] = dict()
+            channel_num, label_type = match.groups()
 
-            channels[channel_num]['PnN'] = self.text[match.group()]
+            if label_type.lower() == 'n':
+                channels[channel_num] = dict()
+                channels[channel_num]['PnN'] = value
+            else:
+                pns_labels[channel_num] = value
 
-            # now check for PnS field, which is optional so may not exist
-            regex_pns = re.compile("^p%ss$" % channel_num, re.IGNORECASE)
-            for j in self.text.keys():
-                match = regex_pns.match(j)
-                if match:
-                    channels[channel_num]['PnS'] = self.text[match.group()]
+        # now add the PnS fields, which are optional so may not exist
+        for channel_num, pns_label in pns_labels.items():
+            if channel_num in channels:
+                channels[channel_num]['PnS'] = pns_label
 
         return channels
 
@@ -586,14 +669,10 @@ class FlowData(object):
             if 'cyt' in self.text:
                 metadata['cyt'] = self.text['cyt']
 
-        pnn_labels = [''] * len(self.channels)
-        pns_labels = [''] * len(self.channels)
-
-        for k in self.channels:
-            pnn_labels[int(k) - 1] = self.channels[k]['PnN']
-
-            if 'PnS' in self.channels[k]:
-                pns_labels[int(k) - 1] = self.channels[k]['PnS']
+        # channel labels in channel number order, PnS is optional
+        channels = [self.channels[k] for k in sorted(self.channels, key=int)]
+        pnn_labels = [channel['PnN'] for channel in channels]
+        pns_labels = [channel.get('PnS', '') for channel in channels]
 
         fh = open(filename, 'wb')
         fh = create_fcs(
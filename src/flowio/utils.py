@@ -12,7 +12,7 @@ def read_multiple_data_sets(
     """
     Utility function for reading all data sets contained in an FCS file.
 
-    :param filename_or_handle: a path string or a file handle for an FCS file
+    :param filename_or_handle: a path string, path-like object, or a file handle for an FCS file
     :param ignore_offset_error: option to ignore data offset error (see above note), default is False
     :param ignore_offset_discrepancy: option to ignore discrepancy between the HEADER
         and TEXT values for the DATA byte offset location, default is False
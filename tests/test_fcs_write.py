@@ -1,4 +1,6 @@
 import unittest
+import gc
+import io
 import os
 import numpy as np
 import warnings
@@ -26,6 +28,82 @@ class CreateFCSTestCase(unittest.TestCase):
 
         self.assertIsInstance(exported_flow_data, FlowData)
 
+    def test_create_fcs_from_2d_ndarray(self):
+        event_data = np.arange(24, dtype=np.float64).reshape(-1, 3)
+        pnn_labels = ['FSC-A', 'SSC-A', 'FLR1-A']
+
+        export_file_path = "examples/fcs_files/test_fcs_export_ndarray.fcs"
+        fh = open(export_file_path, 'wb')
+        create_fcs(fh, event_data, channel_names=pnn_labels)
+        fh.close()
+
+        exported_flow_data = FlowData(export_file_path)
+        os.unlink(export_file_path)
+
+        self.assertEqual(exported_flow_data.event_count, 8)
+        self.assertListEqual(event_data.flatten().tolist(), list(exported_flow_data.events))
+
+    def test_create_fcs_from_big_endian_ndarray(self):
+        event_data = np.arange(24, dtype='>f8').reshape(-1, 3)
+        pnn_labels = ['FSC-A', 'SSC-A', 'FLR1-A']
+
+        fh = io.BytesIO()
+        create_fcs(fh, event_data, channel_names=pnn_labels)
+        fh.seek(0)
+
+        exported_flow_data = FlowData(fh)
+
+        self.assertListEqual(event_data.flatten().tolist(), list(exported_flow_data.events))
+
+    def test_create_fcs_from_big_endian_2d_int_ndarray(self):
+        event_data = np.arange(6, dtype='>i2').reshape(3, 2)
+        pnn_labels = ['FSC-A', 'SSC-A']
+
+        fh = io.BytesIO()
+        create_fcs(fh, event_data, channel_names=pnn_labels, metadata_dict={'datatype': 'I'})
+        fh.seek(0)
+
+        exported_flow_data = FlowData(fh)
+
+        self.assertEqual(exported_flow_data.event_count, 3)
+        self.assertListEqual(event_data.flatten().tolist(), list(exported_flow_data.events))
+
+    def test_create_fcs_from_empty_2d_ndarray(self):
+        event_data = np.empty((0, 3))
+        pnn_labels = ['FSC-A', 'SSC-A', 'FLR1-A']
+
+        fh = io.BytesIO()
+        create_fcs(fh, event_data, channel_names=pnn_labels)
+        fh.seek(0)
+
+        exported_flow_data = FlowData(fh)
+
+        self.assertEqual(exported_flow_data.event_count, 0)
+        self.assertEqual(len(exported_flow_data.events), 0)
+
+    def test_create_fcs_unbuffered_file(self):
+        event_data = self.flow_data.events
+        pnn_labels = [v['PnN'] for k, v in self.flow_data.channels.items()]
+
+        export_file_path = "examples/fcs_files/test_fcs_export_unbuffered.fcs"
+        with open(export_file_path, 'wb', buffering=0) as fh:
+            create_fcs(fh, event_data, channel_names=pnn_labels)
+            self.assertFalse(fh.closed)
+
+        exported_flow_data = FlowData(export_file_path)
+        os.unlink(export_file_path)
+
+        self.assertEqual(list(event_data), list(exported_flow_data.events))
+
+    def test_create_fcs_unbuffered_file_left_open_on_error(self):
+        export_file_path = "examples/fcs_files/test_fcs_export_unbuffered_error.fcs"
+        with open(export_file_path, 'wb', buffering=0) as fh:
+            self.assertRaises(TypeError, create_fcs, fh, [1.0, 'x'], ['a', 'b'])
+            gc.collect()
+            self.assertFalse(fh.closed)
+
+        os.unlink(export_file_path)
+
     def test_create_fcs_data_offsets(self):
         """
         This tests whether FlowIO properly calculates
@@ -355,6 +433,52 @@ class CreateFCSTestCase(unittest.TestCase):
 
         self.assertEqual(p9n_tag_value, p9n_tag_truth)
 
+    def test_create_fcs_int_data(self):
+        flow_data = FlowData('examples/fcs_files/data1.fcs')
+        pnn_labels = [v['PnN'] for k, v in flow_data.channels.items()]
+
+        export_file_path = "examples/fcs_files/test_fcs_export_int.fcs"
+        fh = open(export_file_path, 'wb')
+        create_fcs(
+            fh,
+            flow_data.events,
+            pnn_labels,
+            metadata_dict={'$DATATYPE': 'I', 'p3e': '4,0'}
+        )
+        fh.close()
+
+        exported_flow_data = FlowData(export_file_path)
+        os.unlink(export_file_path)
+
+        self.assertEqual(exported_flow_data.text['datatype'], 'I')
+        self.assertEqual(exported_flow_data.text['p1b'], '16')
+        self.assertEqual(exported_flow_data.text['p1r'], '65536')
+        self.assertEqual(exported_flow_data.text['p3e'], '4,0')
+        self.assertEqual(list(flow_data.events), list(exported_flow_data.events))
+
+    def test_create_fcs_int_data_from_float_values(self):
+        event_data = np.arange(4.0)
+
+        fh = io.BytesIO()
+        create_fcs(fh, event_data, ['FSC-A'], metadata_dict={'datatype': 'I'})
+        fh.seek(0)
+
+        exported_flow_data = FlowData(fh)
+
+        self.assertEqual(exported_flow_data.text['datatype'], 'I')
+        self.assertListEqual([0, 1, 2, 3], list(exported_flow_data.events))
+
+        # fractional values are rejected rather than rounded
+        fh = io.BytesIO()
+        self.assertRaises(
+            ValueError,
+            create_fcs,
+            fh,
+            [1.5, 2.0],
+            ['FSC-A'],
+            metadata_dict={'datatype': 'I'}
+        )
+
     def test_create_fcs_with_2byte_char(self):
         fcs_path = "examples/fcs_files/data1.fcs"
         export_file_path = "examples/fcs_files/test_fcs_export.fcs"
@@ -2,8 +2,9 @@ import shutil
 import unittest
 import os
 import io
+import pathlib
 import tempfile
-from flowio import FlowData
+from flowio import FlowData, create_fcs
 from flowio.exceptions import DataOffsetDiscrepancyError
 
 
@@ -40,6 +41,17 @@ class FlowDataTestCase(unittest.TestCase):
             mem_file = io.BytesIO(f.read())
             FlowData(mem_file)
 
+    def test_load_fcs_from_path_object(self):
+        flow_data = FlowData(pathlib.Path('examples/fcs_files/3FITC_4PE_004.fcs'))
+
+        self.assertEqual(flow_data.name, '3FITC_4PE_004.fcs')
+        self.assertEqual(len(flow_data.events), len(self.flow_data.events))
+
+    def test_load_fcs_from_bytes_path(self):
+        flow_data = FlowData(b'examples/fcs_files/3FITC_4PE_004.fcs')
+
+        self.assertEqual(flow_data.name, '3FITC_4PE_004.fcs')
+
     def test_load_temp_file(self):
         with tempfile.TemporaryFile() as tmp_file:
             with open('examples/fcs_files/3FITC_4PE_004.fcs', 'r+b') as f:
@@ -48,10 +60,29 @@ class FlowDataTestCase(unittest.TestCase):
             out_data = FlowData(tmp_file)
         self.assertIsInstance(out_data, FlowData)
 
+    def test_load_from_same_handle_as_written(self):
+        # the written bytes may still be buffered in the file handle
+        with tempfile.TemporaryFile() as tmp_file:
+            create_fcs(tmp_file, [1.0, 2.0, 3.0, 4.0], ['a', 'b'])
+            flow_data = FlowData(tmp_file)
+
+        self.assertEqual(flow_data.event_count, 2)
+        self.assertListEqual(list(flow_data.events), [1.0, 2.0, 3.0, 4.0])
+
     def test_load_non_file_input(self):
         non_file = object()
         self.assertRaises(AttributeError, FlowData, non_file)
 
+    def test_text_values_keep_dollar_sign(self):
+        fh = io.BytesIO()
+        create_fcs(fh, [1.0, 2.0], ['FSC-A'], metadata_dict={'$COM': 'cost $5', 'BD$NPAR': '1'})
+        fh.seek(0)
+
+        flow_data = FlowData(fh)
+
+        self.assertEqual(flow_data.text['com'], 'cost $5')
+        self.assertEqual(flow_data.text['bdnpar'], '1')
+
     def test_write_fcs(self):
         file_name = 'tests/flowio_test_write_fcs.fcs'
         self.flow_data_spill.write_fcs(file_name)